@@ -1,14 +1,31 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime
 import hashlib
 import json
+import logging
+import re
 import sqlite3
+import atexit
+import threading
+import weakref
+from itertools import islice
+from contextlib import contextmanager
 from pathlib import Path
 import os
 
+logger = logging.getLogger(__name__)
+
+# orjsonがあれば高速なシリアライザを使い、なければ標準のjsonで代替する
+try:
+    import orjson
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(obj):
+        return json.dumps(obj, ensure_ascii=False).encode()
+    json_loads = json.loads
+
 # ページ設定
 st.set_page_config(
     page_title="国民投票システム",
@@ -17,8 +34,10 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# カスタムCSS
-st.markdown("""
+# カスタムCSS（文字列は一度だけ生成してプロセス全体で再利用）
+@st.cache_resource
+def _css_block():
+    return """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -57,25 +76,222 @@ st.markdown("""
         font-weight: bold;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+st.markdown(_css_block(), unsafe_allow_html=True)
+
+# 静的なHTMLブロック（再実行のたびに文字列を組み立て直さないようモジュール定数にする）
+_LOGIN_INFO_HTML = """
+<div class="info-box">
+    <h4>🔐 Googleアカウントでログイン</h4>
+    <p>Google OAuth 2.0認証を使用してログインしてください。</p>
+</div>
+"""
+
+_SYSTEM_FEATURES_HTML = """
+<div class="info-box">
+    <h4>✨ システムの特徴</h4>
+    <ul>
+        <li>🔒 OAuth 2.0による安全な認証</li>
+        <li>💾 SQLiteによるデータ永続化</li>
+        <li>🔐 無記名投票で匿名性を保証</li>
+        <li>✅ 二重投票・二重署名防止</li>
+        <li>📊 リアルタイム集計表示</li>
+    </ul>
+</div>
+"""
+
+_SUCCESS_BOX_HTML = """
+<div class="success-box">
+    <strong>✅ このイニシアティブは成立しました</strong><br>
+    レファレンダムタブで投票できます。
+</div>
+"""
+
+_ADMIN_WARNING_HTML = """
+<div class="warning-box">
+    <strong>⚠️ 管理者専用ページ</strong><br>
+    この画面は管理者のみアクセス可能です。設定の変更は全てのユーザーに影響します。
+</div>
+"""
+
+_OAUTH_SETUP_HTML = """
+<div class="info-box">
+    <h4>Google OAuth 2.0の設定手順</h4>
+    <ol>
+        <li><strong>Google Cloud Console</strong>にアクセス
+            <ul>
+                <li>https://console.cloud.google.com/</li>
+            </ul>
+        </li>
+        <li><strong>プロジェクトを作成</strong>
+            <ul>
+                <li>新しいプロジェクトを作成または既存のものを選択</li>
+            </ul>
+        </li>
+        <li><strong>OAuth同意画面を設定</strong>
+            <ul>
+                <li>「APIとサービス」→「OAuth同意画面」</li>
+                <li>ユーザータイプを選択（外部/内部）</li>
+                <li>アプリ情報を入力</li>
+            </ul>
+        </li>
+        <li><strong>認証情報を作成</strong>
+            <ul>
+                <li>「認証情報」→「認証情報を作成」→「OAuthクライアントID」</li>
+                <li>アプリケーションタイプ: Webアプリケーション</li>
+                <li>承認済みのリダイレクトURIを追加</li>
+            </ul>
+        </li>
+        <li><strong>Streamlit Secretsに設定</strong>
+            <ul>
+                <li>プロジェクトルートに<code>.streamlit/secrets.toml</code>を作成</li>
+                <li>以下を記述：</li>
+            </ul>
+        </li>
+    </ol>
+    
+    <pre style="background: #1f2937; color: #f3f4f6; padding: 1rem; border-radius: 0.5rem; margin-top: 1rem;">
+app_salt = "random-secret-string"
+
+[google_oauth]
+client_id = "your-client-id.apps.googleusercontent.com"
+client_secret = "your-client-secret"
+
+[admin]
+emails = ["admin1@example.com", "admin2@example.com"]
+    </pre>
+    
+    <h4 style="margin-top: 1.5rem;">必要なPythonパッケージ</h4>
+    <pre style="background: #1f2937; color: #f3f4f6; padding: 1rem; border-radius: 0.5rem;">
+google-auth>=2.23.0
+google-auth-oauthlib>=1.1.0
+google-auth-httplib2>=0.1.1
+    </pre>
+</div>
+"""
 
 # =============================================
 # データベースクラス
 # =============================================
 
 class Database:
-    def __init__(self, db_path="referendum_data.db"):
+    # プールに残しておく未使用接続の上限
+    MAX_IDLE_CONNECTIONS = 8
+    
+    def __init__(self, db_path="referendum_data.db", optimize_interval=600):
         self.db_path = db_path
+        self.optimize_interval = optimize_interval
+        self._tls = threading.local()
+        # Streamlitは再実行ごとに新しいスレッドでスクリプトを実行するため、
+        # 終了したスレッドの接続はここに戻して次のスレッドで使い回す
+        self._idle = []
+        self._pool_lock = threading.Lock()
         self.init_database()
+        # スクリプト実行スレッドは再実行ごとに入れ替わるため、PRAGMA optimizeは常駐する保守スレッドで定期的に行う
+        self._closed = threading.Event()
+        threading.Thread(target=self._run_maintenance, daemon=True).start()
+        atexit.register(self.close)
     
     def get_connection(self):
+        """スレッドごとに接続を割り当てて返す（スレッド内では同じ接続を使う）"""
+        conn = getattr(self._tls, "conn", None)
+        if conn is None:
+            conn = self._acquire()
+            self._tls.conn = conn
+            # スレッドが回収されたら接続をプールに戻す
+            weakref.finalize(threading.current_thread(), self._release, conn)
+        return conn
+    
+    def _acquire(self):
+        """プールの接続を取り出す。空の場合のみ新しく接続してPRAGMAを設定する"""
+        with self._pool_lock:
+            if self._idle:
+                return self._idle.pop()
         # Streamlit Cloudで動作させるため、check_same_thread=Falseを設定
-        return sqlite3.connect(self.db_path, check_same_thread=False)
+        # isolation_level=None: 自動コミット。複数文の書き込みはtransaction()で囲む
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        # 列名で値を参照できるようにする
+        conn.row_factory = sqlite3.Row
+        self._configure_connection(conn)
+        return conn
+    
+    def _release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        with self._pool_lock:
+            if len(self._idle) < self.MAX_IDLE_CONNECTIONS:
+                self._idle.append(conn)
+                return
+        conn.close()
+    
+    def optimize(self):
+        """必要に応じて統計情報を更新する（保守スレッドから定期的に呼ばれる）"""
+        self.get_connection().execute("PRAGMA optimize")
+    
+    def _run_maintenance(self):
+        while not self._closed.wait(self.optimize_interval):
+            try:
+                self.optimize()
+            except Exception:
+                logger.exception("データベースの保守処理でエラーが発生しました")
+    
+    def close(self):
+        """プロセス終了時に一度だけ統計情報を更新し、プールの接続を閉じる"""
+        self._closed.set()
+        try:
+            self.optimize()
+        except sqlite3.Error:
+            pass
+        with self._pool_lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+    
+    def _configure_connection(self, conn):
+        """接続ごとのPRAGMAを設定（journal_mode以外は接続単位で保持されるため毎回実行）"""
+        if self.db_path == ":memory:":
+            return
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-20000")
+        # 読み取りをメモリマップ経由にして、ページ読み込み時のコピーを減らす（最大256MB）
+        conn.execute("PRAGMA mmap_size=268435456")
+        # PRAGMA optimize内で実行されるANALYZEの走査行数を制限する
+        conn.execute("PRAGMA analysis_limit=1000")
+    
+    @contextmanager
+    def transaction(self, immediate=False):
+        """明示的なBEGIN/COMMITで囲み、例外時はロールバックする"""
+        conn = self.get_connection()
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield conn.cursor()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    
+    @staticmethod
+    def bulk_insert(cursor, sql_prefix, rows, values_template, chunk=500):
+        """複数行VALUES形式のINSERTでchunk行ずつまとめて投入"""
+        rows = iter(rows)
+        while True:
+            block = list(islice(rows, chunk))
+            if not block:
+                break
+            placeholders = ",".join([values_template] * len(block))
+            params = [value for row in block for value in row]
+            cursor.execute(f"{sql_prefix} VALUES {placeholders}", params)
     
     def init_database(self):
         """データベースとテーブルを初期化"""
+        # get_connection()経由でWALモード等のPRAGMAが設定される
         conn = self.get_connection()
         cursor = conn.cursor()
+        cursor.execute("BEGIN")
         
         # ユーザーテーブル
         cursor.execute("""
@@ -154,11 +370,19 @@ class Database:
             user_id TEXT NOT NULL,
             query TEXT NOT NULL,
             answer TEXT NOT NULL,
-            sources TEXT NOT NULL,
+            sources BLOB NOT NULL,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
         """)
         
+        # 集計・履歴取得用のインデックス
+        # (proposal_id, voter_id)・(initiative_id, voter_id)はUNIQUE制約の自動インデックスが兼ねるため、
+        # ここでは集計用と、投票者から引く逆方向の複合インデックスを追加する
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_votes_prop_type ON votes(proposal_id, vote_type)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_votes_voter ON votes(voter_id, proposal_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_signatures_voter ON signatures(voter_id, initiative_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_fact_checks_user_created ON fact_checks(user_id, created_at DESC)")
+        
         # 初期データ投入
         cursor.execute("SELECT COUNT(*) FROM proposals")
         if cursor.fetchone()[0] == 0:
@@ -174,11 +398,13 @@ class Database:
             INSERT INTO initiatives (title, description, required_signatures) VALUES 
             ('最低賃金の引き上げ', '全国一律で最低賃金を1,500円に引き上げる', 10000)
             """)
-            # 初期署名データ
-            for i in range(8500):
-                cursor.execute("""
-                INSERT INTO signatures (initiative_id, voter_id) VALUES (1, ?)
-                """, (f"initial_voter_{i}",))
+            # 初期署名データ（単一トランザクション内で500行ずつまとめて投入）
+            self.bulk_insert(
+                cursor,
+                "INSERT INTO signatures (initiative_id, voter_id)",
+                ((1, f"initial_voter_{i}") for i in range(8500)),
+                "(?, ?)"
+            )
         
         cursor.execute("SELECT COUNT(*) FROM settings WHERE key='required_signatures'")
         if cursor.fetchone()[0] == 0:
@@ -186,8 +412,28 @@ class Database:
             INSERT INTO settings (key, value) VALUES ('required_signatures', '10000')
             """)
         
+        # 署名数が必要数に達したらイニシアティブを成立させ、レファレンダムを作成するトリガー
+        # （初期署名の投入で毎行評価されないよう、初期データ投入後に作成する）
+        cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS tr_qualify_initiative
+        AFTER INSERT ON signatures
+        WHEN (SELECT status FROM initiatives WHERE id=NEW.initiative_id) = 'collecting'
+         AND (SELECT COUNT(*) FROM signatures WHERE initiative_id=NEW.initiative_id)
+             >= (SELECT required_signatures FROM initiatives WHERE id=NEW.initiative_id)
+        BEGIN
+            UPDATE initiatives SET status='qualified' WHERE id=NEW.initiative_id;
+            INSERT INTO proposals (type, title, description)
+            SELECT 'referendum', title, description || ' (イニシアティブから)'
+            FROM initiatives WHERE id=NEW.initiative_id;
+        END
+        """)
+        
         conn.commit()
-        conn.close()
+        
+        # 統計情報が未作成の場合のみ一度だけANALYZEを実行（クエリプランナーにインデックスを使わせる）
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name='sqlite_stat1'")
+        if cursor.fetchone() is None:
+            cursor.execute("ANALYZE")
     
     # ユーザー関連
     def create_or_update_user(self, google_id, email, name, voter_id, is_admin=False):
@@ -205,7 +451,6 @@ class Database:
         
         conn.commit()
         user = self.get_user_by_id(google_id)
-        conn.close()
         return user
     
     def get_user_by_id(self, user_id):
@@ -213,15 +458,14 @@ class Database:
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM users WHERE id=?", (user_id,))
         row = cursor.fetchone()
-        conn.close()
         
         if row:
             return {
-                'id': row[0],
-                'email': row[1],
-                'name': row[2],
-                'voter_id': row[3],
-                'is_admin': bool(row[4])
+                'id': row['id'],
+                'email': row['email'],
+                'name': row['name'],
+                'voter_id': row['voter_id'],
+                'is_admin': bool(row['is_admin'])
             }
         return None
     
@@ -229,167 +473,126 @@ class Database:
     def get_all_proposals(self):
         conn = self.get_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM proposals ORDER BY created_at DESC")
+        # 提案ごとの票数を1回のJOIN + GROUP BYで集計
+        cursor.execute("""
+        SELECT p.id, p.type, p.title, p.description, p.status,
+               SUM(CASE WHEN v.vote_type='agree' THEN 1 ELSE 0 END) AS agree,
+               SUM(CASE WHEN v.vote_type='disagree' THEN 1 ELSE 0 END) AS disagree,
+               SUM(CASE WHEN v.vote_type='veto' THEN 1 ELSE 0 END) AS veto,
+               SUM(CASE WHEN v.vote_type='approve' THEN 1 ELSE 0 END) AS approve
+        FROM proposals p
+        LEFT JOIN votes v ON v.proposal_id = p.id
+        GROUP BY p.id
+        ORDER BY p.created_at DESC
+        """)
         rows = cursor.fetchall()
-        conn.close()
         
         proposals = []
         for row in rows:
+            if row['type'] == 'referendum':
+                votes = {'agree': row['agree'], 'disagree': row['disagree']}
+            else:
+                votes = {'veto': row['veto'], 'approve': row['approve']}
             proposal = {
-                'id': row[0],
-                'type': row[1],
-                'title': row[2],
-                'description': row[3],
-                'status': row[4],
-                'votes': self.get_vote_counts(row[0])
+                'id': row['id'],
+                'type': row['type'],
+                'title': row['title'],
+                'description': row['description'],
+                'status': row['status'],
+                'votes': votes
             }
             proposals.append(proposal)
         return proposals
     
-    def get_vote_counts(self, proposal_id):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-        SELECT vote_type, COUNT(*) FROM votes 
-        WHERE proposal_id=? 
-        GROUP BY vote_type
-        """, (proposal_id,))
-        rows = cursor.fetchall()
-        
-        cursor.execute("SELECT type FROM proposals WHERE id=?", (proposal_id,))
-        proposal_type = cursor.fetchone()[0]
-        conn.close()
-        
-        if proposal_type == 'referendum':
-            votes = {'agree': 0, 'disagree': 0}
-        else:
-            votes = {'veto': 0, 'approve': 0}
-        
-        for row in rows:
-            votes[row[0]] = row[1]
-        
-        return votes
-    
-    def cast_vote(self, proposal_id, voter_id, vote_type):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-            INSERT INTO votes (proposal_id, voter_id, vote_type) 
-            VALUES (?, ?, ?)
-            """, (proposal_id, voter_id, vote_type))
-            conn.commit()
-            conn.close()
-            return True
-        except sqlite3.IntegrityError:
-            conn.close()
-            return False
+    def cast_votes(self, votes):
+        """(proposal_id, voter_id, vote_type)の組をまとめて1トランザクションで書き込む"""
+        with self.transaction(immediate=True) as cursor:
+            self.bulk_insert(
+                cursor,
+                "INSERT OR IGNORE INTO votes (proposal_id, voter_id, vote_type)",
+                votes,
+                "(?, ?, ?)"
+            )
+        data_version.bump()
     
-    def has_voted(self, proposal_id, voter_id):
+    def get_voted_proposal_ids(self, voter_id):
+        """投票者が投票済みの提案IDを1回のクエリでまとめて取得"""
         conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute("""
-        SELECT COUNT(*) FROM votes 
-        WHERE proposal_id=? AND voter_id=?
-        """, (proposal_id, voter_id))
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count > 0
+        SELECT proposal_id FROM votes WHERE voter_id=?
+        """, (voter_id,))
+        return {row['proposal_id'] for row in cursor.fetchall()}
     
     # イニシアティブ関連
     def get_all_initiatives(self):
         conn = self.get_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM initiatives ORDER BY created_at DESC")
+        # イニシアティブごとの署名数を1回のJOIN + GROUP BYで集計
+        cursor.execute("""
+        SELECT i.id, i.title, i.description, i.required_signatures, i.status,
+               COUNT(s.id) AS signatures
+        FROM initiatives i
+        LEFT JOIN signatures s ON s.initiative_id = i.id
+        GROUP BY i.id
+        ORDER BY i.created_at DESC
+        """)
         rows = cursor.fetchall()
-        conn.close()
         
         initiatives = []
         for row in rows:
             initiative = {
-                'id': row[0],
-                'title': row[1],
-                'description': row[2],
-                'required': row[3],
-                'status': row[4],
-                'signatures': self.get_signature_count(row[0])
+                'id': row['id'],
+                'title': row['title'],
+                'description': row['description'],
+                'required': row['required_signatures'],
+                'status': row['status'],
+                'signatures': row['signatures']
             }
             initiatives.append(initiative)
         return initiatives
     
-    def get_signature_count(self, initiative_id):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-        SELECT COUNT(*) FROM signatures WHERE initiative_id=?
-        """, (initiative_id,))
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
-    
     def sign_initiative(self, initiative_id, voter_id):
         conn = self.get_connection()
         cursor = conn.cursor()
-        try:
-            cursor.execute("""
-            INSERT INTO signatures (initiative_id, voter_id) 
-            VALUES (?, ?)
-            """, (initiative_id, voter_id))
-            conn.commit()
-            
-            signatures = self.get_signature_count(initiative_id)
-            cursor.execute("SELECT required_signatures FROM initiatives WHERE id=?", (initiative_id,))
-            required = cursor.fetchone()[0]
-            
-            if signatures >= required:
-                cursor.execute("""
-                UPDATE initiatives SET status='qualified' WHERE id=?
-                """, (initiative_id,))
-                conn.commit()
-                
-                cursor.execute("SELECT title, description FROM initiatives WHERE id=?", (initiative_id,))
-                title, description = cursor.fetchone()
-                cursor.execute("""
-                INSERT INTO proposals (type, title, description) 
-                VALUES ('referendum', ?, ?)
-                """, (title, description + ' (イニシアティブから)'))
-                conn.commit()
-                conn.close()
-                return True, True
-            
-            conn.close()
-            return True, False
-        except sqlite3.IntegrityError:
-            conn.close()
+        changes_before = conn.total_changes
+        # 成立判定はtr_qualify_initiativeトリガーがINSERTと同一文内で原子的に行う
+        cursor.execute("""
+        INSERT INTO signatures (initiative_id, voter_id) 
+        VALUES (?, ?)
+        ON CONFLICT(initiative_id, voter_id) DO NOTHING
+        """, (initiative_id, voter_id))
+        if cursor.rowcount != 1:
             return False, False
+        
+        # トリガーが成立処理を行った場合、署名以外の変更（initiatives/proposals）も加算される
+        qualified = conn.total_changes - changes_before > 1
+        data_version.bump()
+        return True, qualified
     
-    def has_signed(self, initiative_id, voter_id):
+    def get_signed_initiative_ids(self, voter_id):
+        """投票者が署名済みのイニシアティブIDを1回のクエリでまとめて取得"""
         conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute("""
-        SELECT COUNT(*) FROM signatures 
-        WHERE initiative_id=? AND voter_id=?
-        """, (initiative_id, voter_id))
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count > 0
+        SELECT initiative_id FROM signatures WHERE voter_id=?
+        """, (voter_id,))
+        return {row['initiative_id'] for row in cursor.fetchall()}
     
     def create_initiative(self, title, description, voter_id):
         required = self.get_setting('required_signatures', 10000)
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-        INSERT INTO initiatives (title, description, required_signatures) 
-        VALUES (?, ?, ?)
-        """, (title, description, required))
-        initiative_id = cursor.lastrowid
-        
-        cursor.execute("""
-        INSERT INTO signatures (initiative_id, voter_id) VALUES (?, ?)
-        """, (initiative_id, voter_id))
+        with self.transaction() as cursor:
+            cursor.execute("""
+            INSERT INTO initiatives (title, description, required_signatures) 
+            VALUES (?, ?, ?)
+            """, (title, description, required))
+            initiative_id = cursor.lastrowid
+            
+            cursor.execute("""
+            INSERT INTO signatures (initiative_id, voter_id) VALUES (?, ?)
+            """, (initiative_id, voter_id))
         
-        conn.commit()
-        conn.close()
+        data_version.bump()
         return initiative_id
     
     # 設定関連
@@ -398,13 +601,12 @@ class Database:
         cursor = conn.cursor()
         cursor.execute("SELECT value FROM settings WHERE key=?", (key,))
         row = cursor.fetchone()
-        conn.close()
         
         if row:
             try:
-                return int(row[0])
+                return int(row['value'])
             except:
-                return row[0]
+                return row['value']
         return default
     
     def set_setting(self, key, value):
@@ -415,7 +617,6 @@ class Database:
         ON CONFLICT(key) DO UPDATE SET value=excluded.value, updated_at=CURRENT_TIMESTAMP
         """, (key, str(value)))
         conn.commit()
-        conn.close()
     
     # ファクトチェック関連
     def save_fact_check(self, user_id, query, answer, sources):
@@ -424,54 +625,47 @@ class Database:
         cursor.execute("""
         INSERT INTO fact_checks (user_id, query, answer, sources) 
         VALUES (?, ?, ?, ?)
-        """, (user_id, query, answer, json.dumps(sources)))
+        """, (user_id, query, answer, json_dumps(sources)))
         conn.commit()
-        conn.close()
     
-    def get_fact_check_history(self, user_id, limit=5):
+    def get_fact_check_count(self, user_id):
         conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute("""
-        SELECT query, answer, sources, created_at 
+        SELECT COUNT(*) FROM fact_checks WHERE user_id=?
+        """, (user_id,))
+        return cursor.fetchone()[0]
+    
+    def get_fact_check_history(self, user_id, limit=20, offset=0):
+        """履歴を新しい順にDataFrameで返す（取得と日時変換をpandas側でまとめて行う）"""
+        # created_atは秒単位で同時刻が多いため、idを第2キーにしてページ間の重複・欠落を防ぐ
+        df = pd.read_sql_query("""
+        SELECT query, answer, sources, created_at AS timestamp
         FROM fact_checks 
         WHERE user_id=? 
-        ORDER BY created_at DESC 
-        LIMIT ?
-        """, (user_id, limit))
-        rows = cursor.fetchall()
-        conn.close()
-        
-        history = []
-        for row in rows:
-            history.append({
-                'query': row[0],
-                'answer': row[1],
-                'sources': json.loads(row[2]),
-                'timestamp': datetime.fromisoformat(row[3])
-            })
-        return history
+        ORDER BY created_at DESC, id DESC 
+        LIMIT ? OFFSET ?
+        """, self.get_connection(), params=(user_id, limit, offset), parse_dates=['timestamp'])
+        df['sources'] = df['sources'].map(json_loads)
+        return df
     
     # 統計情報
     def get_statistics(self):
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        cursor.execute("SELECT COUNT(*) FROM proposals WHERE type='referendum'")
-        referendum_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM proposals WHERE type='veto'")
-        veto_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM initiatives")
-        initiative_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM initiatives WHERE status='collecting'")
-        collecting_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM initiatives WHERE status='qualified'")
-        qualified_count = cursor.fetchone()[0]
+        # テーブルごとに1回の走査で条件付き集計（空テーブルではSUMがNULLになるためCOALESCE）
+        cursor.execute("""
+        SELECT COALESCE(SUM(type='referendum'), 0), COALESCE(SUM(type='veto'), 0)
+        FROM proposals
+        """)
+        referendum_count, veto_count = cursor.fetchone()
         
-        conn.close()
+        cursor.execute("""
+        SELECT COUNT(*), COALESCE(SUM(status='collecting'), 0), COALESCE(SUM(status='qualified'), 0)
+        FROM initiatives
+        """)
+        initiative_count, collecting_count, qualified_count = cursor.fetchone()
         
         return {
             'referendum': referendum_count,
@@ -481,37 +675,217 @@ class Database:
             'qualified': qualified_count
         }
 
-# データベースインスタンス
-db = Database()
+# データベースインスタンス（再実行・セッション間で共有。接続はスレッドごとに保持されるため共有しても安全）
+@st.cache_resource
+def get_db():
+    return Database("referendum_data.db")
+
+db = get_db()
+
+# =============================================
+# 読み取り結果のキャッシュ
+# =============================================
+
+class DataVersion:
+    """書き込みのたびに増加する版数。読み取りキャッシュのキーとして使う"""
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+    
+    def bump(self):
+        with self._lock:
+            self.value += 1
+
+@st.cache_resource
+def get_data_version():
+    # スクリプトは再実行のたびにモジュール変数が初期化されるため、プロセス全体で共有する
+    return DataVersion()
+
+data_version = get_data_version()
+
+# 版数ごとにエントリが増えるため、max_entriesで保持数の上限を設ける
+@st.cache_data(ttl=10, max_entries=32, show_spinner=False)
+def get_all_proposals_cached(version):
+    return db.get_all_proposals()
+
+@st.cache_data(ttl=10, max_entries=32, show_spinner=False)
+def get_all_initiatives_cached(version):
+    return db.get_all_initiatives()
+
+# 管理画面の表示用。数秒の遅れは許容し、短いTTLで集計とstat()の呼び出しを抑える
+@st.cache_data(ttl=15, max_entries=32, show_spinner=False)
+def get_statistics_cached(version):
+    return db.get_statistics()
+
+@st.cache_data(ttl=15, show_spinner=False)
+def get_db_size_kb_cached():
+    db_file = Path(db.db_path)
+    if not db_file.exists():
+        return None
+    size = db_file.stat().st_size
+    # WALモードでは直近の書き込みがチェックポイントまで-walファイル側に残るため合算する
+    wal_file = db_file.with_name(db_file.name + "-wal")
+    if wal_file.exists():
+        size += wal_file.stat().st_size
+    return size / 1024  # KB
+
+# 管理者が変更する設定値。set_setting後にclear()で明示的に無効化する
+@st.cache_data(ttl=60, show_spinner=False)
+def get_required_signatures_cached():
+    return db.get_setting('required_signatures', 10000)
+
+# 投票者ごとの投票済み・署名済みID。カードごとに問い合わせず、版数が変わるまで共有する
+@st.cache_data(ttl=5, max_entries=1024, show_spinner=False)
+def get_voted_proposal_ids_cached(version, voter_id):
+    return db.get_voted_proposal_ids(voter_id)
+
+@st.cache_data(ttl=5, max_entries=1024, show_spinner=False)
+def get_signed_initiative_ids_cached(version, voter_id):
+    return db.get_signed_initiative_ids(voter_id)
+
+# 履歴の1ページあたりの件数
+HISTORY_PAGE_SIZE = 20
+
+# ユーザーごとの履歴。保存時にclear()で明示的に無効化する
+@st.cache_data(ttl=30, max_entries=64, show_spinner=False)
+def get_fact_check_history_cached(user_id, limit, offset):
+    return db.get_fact_check_history(user_id, limit, offset)
+
+@st.cache_data(ttl=30, max_entries=64, show_spinner=False)
+def get_fact_check_count_cached(user_id):
+    return db.get_fact_check_count(user_id)
+
+# =============================================
+# 投票バッファ
+# =============================================
+
+class VoteBuffer:
+    """投票を一時的に溜め、一定間隔（または一定件数）ごとにまとめて書き込む"""
+    def __init__(self, database, flush_interval=1.0, max_pending=100):
+        self.database = database
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = {}   # (proposal_id, voter_id) -> vote_type
+        self._flushing = {}  # 書き込み中の投票（コミットされるまで投票済みとして扱う）
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        threading.Thread(target=self._run, daemon=True).start()
+        atexit.register(self.flush)
+    
+    def enqueue(self, proposal_id, voter_id, vote_type):
+        """投票を受け付ける。確認と登録はロック内で一度に行い、受付済みの場合はFalse"""
+        key = (proposal_id, voter_id)
+        with self._lock:
+            if key in self._pending or key in self._flushing:
+                return False
+            self._pending[key] = vote_type
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self._wake.set()
+        return True
+    
+    def is_pending(self, proposal_id, voter_id):
+        key = (proposal_id, voter_id)
+        with self._lock:
+            return key in self._pending or key in self._flushing
+    
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                self._flushing, self._pending = self._pending, {}
+            try:
+                self.database.cast_votes(
+                    (proposal_id, voter_id, vote_type)
+                    for (proposal_id, voter_id), vote_type in self._flushing.items()
+                )
+            except sqlite3.Error:
+                # 書き込みに失敗した投票は次回の書き込みで再試行する
+                logger.warning("投票の書き込みに失敗しました（%d件を再試行します）",
+                               len(self._flushing), exc_info=True)
+                with self._lock:
+                    for key, vote_type in self._flushing.items():
+                        self._pending.setdefault(key, vote_type)
+            finally:
+                with self._lock:
+                    self._flushing = {}
+    
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            # 想定外の例外でワーカーが止まると以降の投票が書き込まれなくなるため、記録して継続する
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("投票バッファの書き込み処理で予期しないエラーが発生しました")
+
+@st.cache_resource
+def get_vote_buffer():
+    return VoteBuffer(db)
+
+vote_buffer = get_vote_buffer()
 
 # =============================================
 # ユーティリティ関数
 # =============================================
 
+def _app_salt():
+    """secrets.tomlのapp_saltを返す（未設定の場合はNone）"""
+    try:
+        return st.secrets['app_salt']
+    except (KeyError, AttributeError, FileNotFoundError):
+        return None
+
+@st.cache_resource
+def _warn_missing_app_salt():
+    # プロセスごとに一度だけ記録する
+    logger.warning("app_saltが未設定のため、投票者IDを鍵なしのハッシュで生成しています。"
+                   "google_idから投票者IDを再計算できる状態です")
+
+def _voter_id_key():
+    """secrets.tomlのapp_saltから投票者ID用の鍵を導出（未設定の場合は警告を記録して鍵なし）"""
+    salt = _app_salt()
+    if salt is None:
+        _warn_missing_app_salt()
+        return b''
+    # BLAKE2sの鍵は最大32バイトのため、任意長のsaltを32バイトに縮める
+    return hashlib.blake2s(str(salt).encode()).digest()
+
 def generate_voter_id(google_id):
-    """匿名投票者IDを生成"""
-    return hashlib.sha256(f"{google_id}_{datetime.now().date().isoformat()}".encode()).hexdigest()[:16]
+    """匿名投票者IDを生成（ログイン時に一度だけ呼ばれるため、キャッシュせず毎回計算する）"""
+    today = datetime.now().date().isoformat()
+    # 鍵付きBLAKE2s。app_saltが設定されていれば、saltを知らない限りgoogle_idから投票者IDを再計算できない（16桁は従来と同じ）
+    return hashlib.blake2s(f"{google_id}_{today}".encode(), digest_size=8, key=_voter_id_key()).hexdigest()
 
+# ファクトチェック（モック）の回答データ
+MOCK_FACT_CHECK_RESPONSES = {
+    '消費税': {
+        'answer': '消費税率10%は2019年10月に導入されました。軽減税率により食品等は8%が維持されています。',
+        'sources': ['財務省', '国税庁']
+    },
+    '防衛費': {
+        'answer': '2024年度の防衛費は約7.9兆円で、GDP比約1.6%となっています。',
+        'sources': ['防衛省', '財務省']
+    },
+    '最低賃金': {
+        'answer': '2024年度の全国加重平均最低賃金は1,054円です。都道府県により異なります。',
+        'sources': ['厚生労働省']
+    }
+}
+
+# 全キーワードを1つの正規表現にまとめ、質問文を1回の走査で照合する
+_FACT_CHECK_KEYWORD_RE = re.compile("|".join(map(re.escape, MOCK_FACT_CHECK_RESPONSES)))
+
+# 同じ質問への回答は使い回す（履歴の保存は呼び出し側で毎回行う）
+@st.cache_data(ttl=3600, max_entries=256, show_spinner="ファクトチェック中...")
 def get_fact_check_response(query):
     """ファクトチェック（モック）"""
-    mock_responses = {
-        '消費税': {
-            'answer': '消費税率10%は2019年10月に導入されました。軽減税率により食品等は8%が維持されています。',
-            'sources': ['財務省', '国税庁']
-        },
-        '防衛費': {
-            'answer': '2024年度の防衛費は約7.9兆円で、GDP比約1.6%となっています。',
-            'sources': ['防衛省', '財務省']
-        },
-        '最低賃金': {
-            'answer': '2024年度の全国加重平均最低賃金は1,054円です。都道府県により異なります。',
-            'sources': ['厚生労働省']
-        }
-    }
-    
-    for key, response in mock_responses.items():
-        if key in query:
-            return response
+    match = _FACT_CHECK_KEYWORD_RE.search(query)
+    if match:
+        return MOCK_FACT_CHECK_RESPONSES[match.group(0)]
     
     return {
         'answer': 'ご質問の内容について、公的機関のデータに基づいて回答します。詳細な情報源もご確認ください。',
@@ -525,6 +899,135 @@ def get_fact_check_response(query):
 if 'user' not in st.session_state:
     st.session_state.user = None
 
+# =============================================
+# 描画用フラグメント
+# =============================================
+
+def _on_vote_click(proposal_id, voter_id, vote_type):
+    """投票ボタンのコールバック。フラグメントの再実行前に呼ばれるため、st.rerunは不要"""
+    # 受付済みの投票はenqueueがFalseを返すため、連打しても二重には登録されない
+    # コールバック内での要素の表示はサポートされないため、通知はフラグを立ててカード側で出す
+    if vote_buffer.enqueue(proposal_id, voter_id, vote_type):
+        st.session_state[f"vote_done_{proposal_id}"] = True
+
+@st.fragment
+def render_referendum_card(proposal):
+    """レファレンダムのカード（投票ボタンのクリックではこのカードだけを再実行する）"""
+    with st.container():
+        st.subheader(proposal['title'])
+        st.write(proposal['description'])
+        
+        if st.session_state.pop(f"vote_done_{proposal['id']}", False):
+            st.toast("✅ 投票完了")
+        
+        # DataFrameを組み立てず、選択肢をキーにした辞書をそのまま渡す
+        votes_data = {'票数': {'賛成': proposal['votes']['agree'], '反対': proposal['votes']['disagree']}}
+        st.bar_chart(votes_data, height=300)
+        
+        voter_id = st.session_state.user['voter_id']
+        # バッファ内の未書き込みの投票も投票済みとして扱う。flushは版数を上げてからバッファを空にするため、
+        # 先にバッファを確認し、なければその後に版数とキャッシュを読めば書き込み済みの投票を取りこぼさない
+        if (vote_buffer.is_pending(proposal['id'], voter_id)
+                or proposal['id'] in get_voted_proposal_ids_cached(data_version.value, voter_id)):
+            st.success("✅ 投票済み")
+        else:
+            col1, col2 = st.columns(2)
+            with col1:
+                st.button(f"👍 賛成 ({proposal['votes']['agree']})", 
+                          key=f"agree_{proposal['id']}", 
+                          use_container_width=True,
+                          on_click=_on_vote_click,
+                          args=(proposal['id'], voter_id, 'agree'))
+            with col2:
+                st.button(f"👎 反対 ({proposal['votes']['disagree']})", 
+                          key=f"disagree_{proposal['id']}", 
+                          use_container_width=True,
+                          on_click=_on_vote_click,
+                          args=(proposal['id'], voter_id, 'disagree'))
+        
+        st.markdown("---")
+
+@st.fragment
+def render_veto_card(proposal):
+    """拒否権投票のカード"""
+    with st.container():
+        st.subheader(proposal['title'])
+        st.write(proposal['description'])
+        
+        if st.session_state.pop(f"vote_done_{proposal['id']}", False):
+            st.toast("✅ 投票完了")
+        
+        col_veto, col_approve = st.columns(2)
+        col_veto.metric("🚫 拒否", proposal['votes']['veto'])
+        col_approve.metric("✅ 承認", proposal['votes']['approve'])
+        
+        voter_id = st.session_state.user['voter_id']
+        # バッファ内の未書き込みの投票も投票済みとして扱う。flushは版数を上げてからバッファを空にするため、
+        # 先にバッファを確認し、なければその後に版数とキャッシュを読めば書き込み済みの投票を取りこぼさない
+        if (vote_buffer.is_pending(proposal['id'], voter_id)
+                or proposal['id'] in get_voted_proposal_ids_cached(data_version.value, voter_id)):
+            st.success("✅ 投票済み")
+        else:
+            col1, col2 = st.columns(2)
+            with col1:
+                st.button(f"🚫 拒否 ({proposal['votes']['veto']})", 
+                          key=f"veto_{proposal['id']}", 
+                          use_container_width=True,
+                          on_click=_on_vote_click,
+                          args=(proposal['id'], voter_id, 'veto'))
+            with col2:
+                st.button(f"✅ 承認 ({proposal['votes']['approve']})", 
+                          key=f"approve_{proposal['id']}", 
+                          use_container_width=True,
+                          on_click=_on_vote_click,
+                          args=(proposal['id'], voter_id, 'approve'))
+        
+        st.markdown("---")
+
+@st.fragment
+def render_initiative_card(initiative):
+    """イニシアティブのカード"""
+    with st.container():
+        col1, col2 = st.columns([3, 1])
+        
+        with col1:
+            st.subheader(initiative['title'])
+            st.write(initiative['description'])
+        
+        with col2:
+            if initiative['status'] == 'qualified':
+                st.success("✅ 成立")
+            else:
+                st.warning("📝 募集中")
+        
+        progress = min(initiative['signatures'] / initiative['required'], 1.0)
+        st.progress(progress)
+        st.caption(f"進捗: {initiative['signatures']} / {initiative['required']} 署名 ({progress*100:.1f}%)")
+        
+        if initiative['status'] == 'collecting':
+            signed_ids = get_signed_initiative_ids_cached(data_version.value, st.session_state.user['voter_id'])
+            if initiative['id'] in signed_ids:
+                st.success("✅ 署名済み")
+            else:
+                if st.button(f"✍️ 署名する", key=f"sign_{initiative['id']}", 
+                           use_container_width=True, type="primary"):
+                    # 二重署名はsign_initiativeのON CONFLICTで弾かれる
+                    success, qualified = db.sign_initiative(initiative['id'], st.session_state.user['voter_id'])
+                    if success:
+                        if qualified:
+                            st.balloons()
+                            st.success(f"🎉 イニシアティブ「{initiative['title']}」が成立しました！")
+                            st.info("📋 レファレンダムタブに追加されました")
+                        else:
+                            st.success("✅ 署名完了")
+                        st.rerun()
+                    else:
+                        st.warning("既に署名済みです")
+        else:
+            st.markdown(_SUCCESS_BOX_HTML, unsafe_allow_html=True)
+        
+        st.markdown("---")
+
 # =============================================
 # メインアプリケーション
 # Google OAuth 2.0 認証を実装するために、このブロックを修正します
@@ -539,12 +1042,7 @@ if not st.session_state.user:
     with col2:
         st.markdown("---")
         
-        st.markdown("""
-        <div class="info-box">
-            <h4>🔐 Googleアカウントでログイン</h4>
-            <p>Google OAuth 2.0認証を使用してログインしてください。</p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_LOGIN_INFO_HTML, unsafe_allow_html=True)
         
         # -----------------------------------------------------------
         # Google OAuth 2.0 認証の実際の呼び出し
@@ -606,18 +1104,7 @@ if not st.session_state.user:
         
         st.markdown("---")
         
-        st.markdown("""
-        <div class="info-box">
-            <h4>✨ システムの特徴</h4>
-            <ul>
-                <li>🔒 OAuth 2.0による安全な認証</li>
-                <li>💾 SQLiteによるデータ永続化</li>
-                <li>🔐 無記名投票で匿名性を保証</li>
-                <li>✅ 二重投票・二重署名防止</li>
-                <li>📊 リアルタイム集計表示</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_SYSTEM_FEATURES_HTML, unsafe_allow_html=True)
 
 else:
     # ヘッダー
@@ -644,158 +1131,56 @@ else:
     # レファレンダムタブ
     with tab_objects[0]:
         st.header("📋 国民投票（レファレンダム）")
-        proposals = db.get_all_proposals()
+        proposals = get_all_proposals_cached(data_version.value)
         referendum_proposals = [p for p in proposals if p['type'] == 'referendum']
         
         if not referendum_proposals:
             st.info("現在進行中のレファレンダムはありません")
         
         for proposal in referendum_proposals:
-            with st.container():
-                st.subheader(proposal['title'])
-                st.write(proposal['description'])
-                
-                votes_data = pd.DataFrame({
-                    '選択肢': ['賛成', '反対'],
-                    '票数': [proposal['votes']['agree'], proposal['votes']['disagree']]
-                })
-                
-                fig = px.bar(votes_data, x='選択肢', y='票数', 
-                            color='選択肢',
-                            color_discrete_map={'賛成': '#10B981', '反対': '#EF4444'})
-                fig.update_layout(showlegend=False, height=300)
-                st.plotly_chart(fig, use_container_width=True)
-                
-                if db.has_voted(proposal['id'], st.session_state.user['voter_id']):
-                    st.success("✅ 投票済み")
-                else:
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        if st.button(f"👍 賛成 ({proposal['votes']['agree']})", 
-                                   key=f"agree_{proposal['id']}", 
-                                   use_container_width=True):
-                            if db.cast_vote(proposal['id'], st.session_state.user['voter_id'], 'agree'):
-                                st.success("✅ 投票完了")
-                                st.rerun()
-                    with col2:
-                        if st.button(f"👎 反対 ({proposal['votes']['disagree']})", 
-                                   key=f"disagree_{proposal['id']}", 
-                                   use_container_width=True):
-                            if db.cast_vote(proposal['id'], st.session_state.user['voter_id'], 'disagree'):
-                                st.success("✅ 投票完了")
-                                st.rerun()
-                
-                st.markdown("---")
+            render_referendum_card(proposal)
     
     # 拒否権投票タブ
     with tab_objects[1]:
         st.header("🚫 拒否権行使投票")
-        proposals = db.get_all_proposals()
+        proposals = get_all_proposals_cached(data_version.value)
         veto_proposals = [p for p in proposals if p['type'] == 'veto']
         
         if not veto_proposals:
             st.info("現在進行中の拒否権投票はありません")
         
         for proposal in veto_proposals:
-            with st.container():
-                st.subheader(proposal['title'])
-                st.write(proposal['description'])
-                
-                votes_data = pd.DataFrame({
-                    '選択肢': ['拒否', '承認'],
-                    '票数': [proposal['votes']['veto'], proposal['votes']['approve']]
-                })
-                
-                fig = px.pie(votes_data, values='票数', names='選択肢',
-                           color='選択肢',
-                           color_discrete_map={'拒否': '#EF4444', '承認': '#3B82F6'})
-                fig.update_layout(height=300)
-                st.plotly_chart(fig, use_container_width=True)
-                
-                if db.has_voted(proposal['id'], st.session_state.user['voter_id']):
-                    st.success("✅ 投票済み")
-                else:
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        if st.button(f"🚫 拒否 ({proposal['votes']['veto']})", 
-                                   key=f"veto_{proposal['id']}", 
-                                   use_container_width=True):
-                            if db.cast_vote(proposal['id'], st.session_state.user['voter_id'], 'veto'):
-                                st.success("✅ 投票完了")
-                                st.rerun()
-                    with col2:
-                        if st.button(f"✅ 承認 ({proposal['votes']['approve']})", 
-                                   key=f"approve_{proposal['id']}", 
-                                   use_container_width=True):
-                            if db.cast_vote(proposal['id'], st.session_state.user['voter_id'], 'approve'):
-                                st.success("✅ 投票完了")
-                                st.rerun()
-                
-                st.markdown("---")
+            render_veto_card(proposal)
     
     # イニシアティブタブ
     with tab_objects[2]:
         st.header("✍️ イニシアティブ（国民発議）")
         
         with st.expander("➕ 新しいイニシアティブを作成", expanded=False):
-            new_title = st.text_input("タイトル", key="new_init_title")
-            new_desc = st.text_area("詳細な説明", key="new_init_desc", height=100)
+            # 送信後に入力欄を空にし、同じ内容の再送信では作成し直さない
+            with st.form("new_initiative_form", clear_on_submit=True):
+                new_title = st.text_input("タイトル", key="new_init_title")
+                new_desc = st.text_area("詳細な説明", key="new_init_desc", height=100)
+                submitted = st.form_submit_button("イニシアティブを作成", type="primary")
             
-            if st.button("イニシアティブを作成", type="primary"):
-                if new_title and new_desc:
+            if submitted:
+                submission = (new_title, new_desc)
+                if not (new_title and new_desc):
+                    st.error("タイトルと説明を入力してください")
+                elif st.session_state.get('last_initiative_submission') == submission:
+                    # 応答前の連打で同じ入力が再送された場合
+                    st.warning("このイニシアティブは既に作成済みです")
+                else:
                     db.create_initiative(new_title, new_desc, st.session_state.user['voter_id'])
+                    st.session_state.last_initiative_submission = submission
                     st.success("✅ イニシアティブが作成されました")
                     st.rerun()
-                else:
-                    st.error("タイトルと説明を入力してください")
         
         st.markdown("---")
         
-        initiatives = db.get_all_initiatives()
+        initiatives = get_all_initiatives_cached(data_version.value)
         for initiative in initiatives:
-            with st.container():
-                col1, col2 = st.columns([3, 1])
-                
-                with col1:
-                    st.subheader(initiative['title'])
-                    st.write(initiative['description'])
-                
-                with col2:
-                    if initiative['status'] == 'qualified':
-                        st.success("✅ 成立")
-                    else:
-                        st.warning("📝 募集中")
-                
-                progress = min(initiative['signatures'] / initiative['required'], 1.0)
-                st.progress(progress)
-                st.caption(f"進捗: {initiative['signatures']} / {initiative['required']} 署名 ({progress*100:.1f}%)")
-                
-                if initiative['status'] == 'collecting':
-                    if db.has_signed(initiative['id'], st.session_state.user['voter_id']):
-                        st.success("✅ 署名済み")
-                    else:
-                        if st.button(f"✍️ 署名する", key=f"sign_{initiative['id']}", 
-                                   use_container_width=True, type="primary"):
-                            success, qualified = db.sign_initiative(initiative['id'], st.session_state.user['voter_id'])
-                            if success:
-                                if qualified:
-                                    st.balloons()
-                                    st.success(f"🎉 イニシアティブ「{initiative['title']}」が成立しました！")
-                                    st.info("📋 レファレンダムタブに追加されました")
-                                else:
-                                    st.success("✅ 署名完了")
-                                st.rerun()
-                            else:
-                                st.warning("既に署名済みです")
-                else:
-                    st.markdown("""
-                    <div class="success-box">
-                        <strong>✅ このイニシアティブは成立しました</strong><br>
-                        レファレンダムタブで投票できます。
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                st.markdown("---")
+            render_initiative_card(initiative)
     
     # ファクトチェックタブ
     with tab_objects[3]:
@@ -817,6 +1202,8 @@ else:
                     response['answer'],
                     response['sources']
                 )
+                get_fact_check_history_cached.clear()
+                get_fact_check_count_cached.clear()
                 
                 st.markdown(f"""
                 <div class="info-box">
@@ -839,28 +1226,37 @@ else:
             else:
                 st.warning("質問を入力してください")
         
-        # 履歴表示
-        history = db.get_fact_check_history(st.session_state.user['id'])
-        if history:
+        # 履歴表示（1ページ分を1つのst.dataframeにまとめて送る）
+        history_total = get_fact_check_count_cached(st.session_state.user['id'])
+        if history_total:
             st.markdown("---")
             st.subheader("📋 過去の質問履歴")
-            for item in history:
-                with st.expander(f"{item['timestamp'].strftime('%Y/%m/%d %H:%M')} - {item['query'][:50]}..."):
-                    st.write(f"**質問:** {item['query']}")
-                    st.write(f"**回答:** {item['answer']}")
-                    st.write(f"**情報源:** {', '.join(item['sources'])}")
+            page_count = -(-history_total // HISTORY_PAGE_SIZE)
+            page = 1
+            if page_count > 1:
+                page = st.number_input("ページ", min_value=1, max_value=page_count, value=1, step=1)
+            history_df = get_fact_check_history_cached(
+                st.session_state.user['id'],
+                HISTORY_PAGE_SIZE,
+                (page - 1) * HISTORY_PAGE_SIZE
+            )
+            history_df['sources'] = history_df['sources'].map(', '.join)
+            history_df = history_df.rename(columns={
+                'timestamp': '日時', 'query': '質問', 'answer': '回答', 'sources': '情報源'
+            })[['日時', '質問', '回答', '情報源']]
+            st.dataframe(history_df, hide_index=True, use_container_width=True)
+            st.caption(f"{history_total}件中 {page} / {page_count} ページ")
     
     # 管理者タブ
     if st.session_state.user['is_admin'] and len(tab_objects) > 4:
         with tab_objects[4]:
             st.header("⚙️ 管理者設定")
             
-            st.markdown("""
-            <div class="warning-box">
-                <strong>⚠️ 管理者専用ページ</strong><br>
-                この画面は管理者のみアクセス可能です。設定の変更は全てのユーザーに影響します。
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(_ADMIN_WARNING_HTML, unsafe_allow_html=True)
+            
+            if _app_salt() is None:
+                st.error("匿名化設定エラー: secrets.tomlにapp_saltが設定されていません。"
+                         "投票者IDが鍵なしで生成されるため、google_idから再計算できてしまいます。")
             
             st.markdown("---")
             
@@ -870,31 +1266,35 @@ else:
             st.write("イニシアティブが成立するために必要な署名数を設定します")
             st.caption("テスト用には少数（例: 3-5人）、本番環境では実際の人数を設定してください")
             
-            current_required = db.get_setting('required_signatures', 10000)
+            current_required = get_required_signatures_cached()
             
             col1, col2, col3, col4 = st.columns(4)
             
             with col1:
                 if st.button("テスト: 3人", use_container_width=True):
                     db.set_setting('required_signatures', 3)
+                    get_required_signatures_cached.clear()
                     st.success("必要署名数を3に設定しました")
                     st.rerun()
             
             with col2:
                 if st.button("デモ: 10人", use_container_width=True):
                     db.set_setting('required_signatures', 10)
+                    get_required_signatures_cached.clear()
                     st.success("必要署名数を10に設定しました")
                     st.rerun()
             
             with col3:
                 if st.button("小規模: 100人", use_container_width=True):
                     db.set_setting('required_signatures', 100)
+                    get_required_signatures_cached.clear()
                     st.success("必要署名数を100に設定しました")
                     st.rerun()
             
             with col4:
                 if st.button("本番: 10,000人", use_container_width=True):
                     db.set_setting('required_signatures', 10000)
+                    get_required_signatures_cached.clear()
                     st.success("必要署名数を10,000に設定しました")
                     st.rerun()
             
@@ -905,6 +1305,7 @@ else:
             
             if st.button("カスタム値を適用", type="primary"):
                 db.set_setting('required_signatures', custom_num)
+                get_required_signatures_cached.clear()
                 st.success(f"必要署名数を{custom_num}に設定しました")
                 st.rerun()
             
@@ -915,7 +1316,7 @@ else:
             # 統計情報
             st.subheader("📊 統計情報")
             
-            stats = db.get_statistics()
+            stats = get_statistics_cached(data_version.value)
             
             col1, col2, col3 = st.columns(3)
             
@@ -943,9 +1344,8 @@ else:
             # データベース情報
             st.subheader("💾 データベース情報")
             
-            db_file = Path("referendum_data.db")
-            if db_file.exists():
-                file_size = db_file.stat().st_size / 1024  # KB
+            file_size = get_db_size_kb_cached()
+            if file_size is not None:
                 st.info(f"データベースファイルサイズ: {file_size:.2f} KB")
             
             st.caption("データはSQLiteデータベースに永続化されています")
@@ -955,57 +1355,5 @@ else:
             # OAuth設定情報
             st.subheader("🔐 OAuth 2.0 設定")
             
-            st.markdown("""
-            <div class="info-box">
-                <h4>Google OAuth 2.0の設定手順</h4>
-                <ol>
-                    <li><strong>Google Cloud Console</strong>にアクセス
-                        <ul>
-                            <li>https://console.cloud.google.com/</li>
-                        </ul>
-                    </li>
-                    <li><strong>プロジェクトを作成</strong>
-                        <ul>
-                            <li>新しいプロジェクトを作成または既存のものを選択</li>
-                        </ul>
-                    </li>
-                    <li><strong>OAuth同意画面を設定</strong>
-                        <ul>
-                            <li>「APIとサービス」→「OAuth同意画面」</li>
-                            <li>ユーザータイプを選択（外部/内部）</li>
-                            <li>アプリ情報を入力</li>
-                        </ul>
-                    </li>
-                    <li><strong>認証情報を作成</strong>
-                        <ul>
-                            <li>「認証情報」→「認証情報を作成」→「OAuthクライアントID」</li>
-                            <li>アプリケーションタイプ: Webアプリケーション</li>
-                            <li>承認済みのリダイレクトURIを追加</li>
-                        </ul>
-                    </li>
-                    <li><strong>Streamlit Secretsに設定</strong>
-                        <ul>
-                            <li>プロジェクトルートに<code>.streamlit/secrets.toml</code>を作成</li>
-                            <li>以下を記述：</li>
-                        </ul>
-                    </li>
-                </ol>
-                
-                <pre style="background: #1f2937; color: #f3f4f6; padding: 1rem; border-radius: 0.5rem; margin-top: 1rem;">
-[google_oauth]
-client_id = "your-client-id.apps.googleusercontent.com"
-client_secret = "your-client-secret"
-
-[admin]
-emails = ["admin1@example.com", "admin2@example.com"]
-                </pre>
-                
-                <h4 style="margin-top: 1.5rem;">必要なPythonパッケージ</h4>
-                <pre style="background: #1f2937; color: #f3f4f6; padding: 1rem; border-radius: 0.5rem;">
-google-auth>=2.23.0
-google-auth-oauthlib>=1.1.0
-google-auth-httplib2>=0.1.1
-                </pre>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(_OAUTH_SETUP_HTML, unsafe_allow_html=True)
             # 最終的な再デプロイのための変更 (2025/10/08)
\ No newline at end of file